@@ -0,0 +1,68 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""Compiled scan kernel for `armstrong.generate_armstrong`.
+
+Optional alternative to the Numba kernel for environments without Numba.
+Build it in place with:
+
+    cythonize -i _armstrong.pyx
+
+`armstrong.py` imports it when available and falls back to pure Python
+otherwise.
+"""
+
+from libc.stdlib cimport free, malloc
+
+
+cpdef list generate(long long limit, long long base):
+	"""Return Armstrong numbers in `[0, limit)` in the given base.
+
+	Every power sum below `limit` must fit in a signed 64-bit integer;
+	`generate_armstrong` checks this before dispatching here.
+	"""
+	cdef long long n, m, d, p, total, width
+	cdef int i, j, k, max_k
+	cdef long long buf[64]
+	cdef long long *table
+	cdef list result = []
+
+	if limit <= 0:
+		return result
+
+	width = base if base < limit else limit
+	max_k = 0
+	m = limit - 1
+	while True:
+		m //= base
+		max_k += 1
+		if m == 0:
+			break
+
+	# table[k * width + d] == d ** k
+	table = <long long *>malloc((max_k + 1) * width * sizeof(long long))
+	if table == NULL:
+		raise MemoryError()
+	try:
+		for k in range(max_k + 1):
+			for d in range(width):
+				p = 1
+				for j in range(k):
+					p *= d
+				table[k * width + d] = p
+
+		for n in range(limit):
+			k = 0
+			m = n
+			while True:
+				buf[k] = m % base
+				k += 1
+				m //= base
+				if m == 0:
+					break
+			total = 0
+			for i in range(k):
+				total += table[k * width + buf[i]]
+			if total == n:
+				result.append(n)
+	finally:
+		free(table)
+	return result
@@ -0,0 +1,96 @@
+"""
+Aggregation Kernels for the Optimized Sales API
+===============================================
+
+Grouped sums over the columnar (SoA) transaction store, keyed by the
+small integer codes the API interns product names and customer ids into.
+
+fold_batch folds one upload batch into every running aggregate in a
+single pass over its columns, loaded from the first of:
+- agg_kernels_aot, the ahead-of-time build made by `python build_kernels.py`
+  (no numba import and no JIT compile when a worker starts)
+- numba JIT compilation, cached on disk so later processes skip compiling
+- np.bincount equivalents when numba is not installed
+"""
+
+import gc
+
+import numpy as np
+
+try:
+    import agg_kernels_aot
+except ImportError:  # pragma: no cover - built by build_kernels.py
+    agg_kernels_aot = None
+
+if agg_kernels_aot is None:
+    try:
+        from numba import njit
+    except ImportError:  # pragma: no cover - numba is optional
+        njit = None
+else:  # pragma: no cover - the AOT build replaces the JIT
+    njit = None
+
+
+def check_codes(codes, n_codes):
+    """
+    Raise ValueError unless every code is in [0, n_codes)
+    
+    The compiled kernels index the per-code arrays without bounds checks,
+    so an out-of-range code would write outside them silently.
+    """
+    if codes.size and (codes.min() < 0 or codes.max() >= n_codes):
+        raise ValueError(f"codes must be in [0, {n_codes})")
+
+
+def batch_sums(product_codes, customer_codes, amounts, quantities,
+               n_products, n_customers):
+    """
+    Every running aggregate for one upload batch in a single fused pass
+
+    Returns (total, product sales, product quantity, customer totals,
+    customer counts); each row's amount is loaded once for all of them.
+    """
+    total = 0.0
+    sales = np.zeros(n_products, np.float64)
+    quantity = np.zeros(n_products, np.int64)
+    spent = np.zeros(n_customers, np.float64)
+    counts = np.zeros(n_customers, np.int64)
+    for i in range(amounts.shape[0]):
+        amount = amounts[i]
+        total += amount
+        code = product_codes[i]
+        sales[code] += amount
+        quantity[code] += quantities[i]
+        code = customer_codes[i]
+        spent[code] += amount
+        counts[code] += 1
+    return total, sales, quantity, spent, counts
+
+
+if agg_kernels_aot is not None:  # pragma: no cover - needs the AOT build
+    fold_batch = agg_kernels_aot.fold_batch
+
+elif njit is not None:
+    fold_batch = njit(cache=True)(batch_sums)
+
+    # Compile (or load from the disk cache) at import, with the dtypes the
+    # API passes, so a worker's first upload does not pay for it; then
+    # collect the compiler's garbage now rather than mid-request
+    fold_batch(
+        np.empty(0, np.int32), np.empty(0, np.int32),
+        np.empty(0, np.float64), np.empty(0, np.int32), 0, 0
+    )
+    gc.collect()
+
+else:
+
+    def fold_batch(product_codes, customer_codes, amounts, quantities,
+                   n_products, n_customers):
+        """Every running aggregate for one upload batch via np.bincount - O(k)"""
+        sales = np.bincount(product_codes, weights=amounts, minlength=n_products)
+        quantity = np.bincount(
+            product_codes, weights=quantities, minlength=n_products
+        ).astype(np.int64)
+        spent = np.bincount(customer_codes, weights=amounts, minlength=n_customers)
+        counts = np.bincount(customer_codes, minlength=n_customers)
+        return float(amounts.sum()), sales, quantity, spent, counts
@@ -8,57 +8,82 @@ Compare performance between inefficient and optimized APIs
 import requests
 import time
 import json
-import random
-from datetime import datetime, timedelta
+import statistics
+import numpy as np
 
 
 def generate_transactions(count=1000):
-    """Generate random transaction data"""
-    transactions = []
-    start_date = datetime(2026, 1, 1)
+    """Generate random transaction data with batched NumPy draws"""
+    rng = np.random.default_rng()
     
     products = ["Laptop", "Mouse", "Keyboard", "Monitor", "Headphones", 
                 "Webcam", "Speaker", "USB Drive", "HDMI Cable", "Charger"]
     
-    for i in range(count):
-        date = start_date + timedelta(days=random.randint(0, 30))
-        transactions.append({
+    # One vectorized draw per field instead of one Python call per row;
+    # tolist() converts to native types so json.dumps accepts them
+    start_date = np.datetime64('2026-01-01')
+    days = rng.integers(0, 31, count)
+    dates = np.datetime_as_string(start_date + days, unit='D').tolist()
+    customer_ids = rng.integers(1, 101, count).tolist()
+    customer_names = rng.integers(1, 101, count).tolist()
+    product_idx = rng.integers(0, len(products), count).tolist()
+    amounts = rng.uniform(10, 2000, count).round(2).tolist()
+    quantities = rng.integers(1, 6, count).tolist()
+    
+    transactions = [
+        {
             "transaction_id": f"T{i:06d}",
-            "customer_id": f"C{random.randint(1, 100):04d}",
-            "customer_name": f"Customer {random.randint(1, 100)}",
-            "product_name": random.choice(products),
-            "amount": round(random.uniform(10, 2000), 2),
-            "quantity": random.randint(1, 5),
-            "date": date.strftime("%Y-%m-%d")
-        })
+            "customer_id": f"C{cid:04d}",
+            "customer_name": f"Customer {cname}",
+            "product_name": products[p],
+            "amount": amount,
+            "quantity": qty,
+            "date": date
+        }
+        for i, (cid, cname, p, amount, qty, date) in enumerate(zip(
+            customer_ids, customer_names, product_idx,
+            amounts, quantities, dates
+        ))
+    ]
     
     return {"transactions": transactions}
 
 
-def benchmark_endpoint(url, method='GET', data=None, iterations=5):
-    """Benchmark an API endpoint"""
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Read endpoints are cheap, so sample them more often than the upload
+GET_ITERATIONS = 20
+
+
+def benchmark_endpoint(session, url, method='GET', data=None, iterations=5):
+    """Benchmark an API endpoint over a shared keep-alive session"""
     times = []
     
+    # Serialize once so the timings measure the API, not the client
+    body = json.dumps(data) if data is not None else None
+    
     for _ in range(iterations):
-        start = time.time()
+        start = time.perf_counter_ns()
         if method == 'POST':
-            response = requests.post(url, json=data)
+            response = session.post(url, data=body, headers=JSON_HEADERS)
         else:
-            response = requests.get(url)
-        end = time.time()
+            response = session.get(url)
+        end = time.perf_counter_ns()
         
         if response.status_code not in [200, 201]:
             print(f"Error: {response.status_code}")
             return None
         
-        times.append(end - start)
+        times.append((end - start) * 1e-9)
     
     avg_time = sum(times) / len(times)
+    median_time = statistics.median(times)
     min_time = min(times)
     max_time = max(times)
     
     return {
         'avg': avg_time,
+        'median': median_time,
         'min': min_time,
         'max': max_time,
         'times': times
@@ -81,10 +106,13 @@ def run_benchmark():
     medium_dataset = generate_transactions(500)
     large_dataset = generate_transactions(1000)
     
+    # Reuse one connection per server instead of reconnecting per request
+    session = requests.Session()
+    
     # Clear existing data
     print("Clearing existing data...")
-    requests.delete(f"{INEFFICIENT_BASE}/transactions")
-    requests.delete(f"{OPTIMIZED_BASE}/transactions")
+    session.delete(f"{INEFFICIENT_BASE}/transactions")
+    session.delete(f"{OPTIMIZED_BASE}/transactions")
     
     # Benchmark 1: Upload Transactions
     print("\n" + "-" * 80)
@@ -93,6 +121,7 @@ def run_benchmark():
     
     print("Testing INEFFICIENT API...")
     ineff_upload = benchmark_endpoint(
+        session,
         f"{INEFFICIENT_BASE}/transactions",
         method='POST',
         data=large_dataset,
@@ -101,6 +130,7 @@ def run_benchmark():
     
     print("Testing OPTIMIZED API...")
     opt_upload = benchmark_endpoint(
+        session,
         f"{OPTIMIZED_BASE}/transactions",
         method='POST',
         data=large_dataset,
@@ -119,20 +149,22 @@ def run_benchmark():
     
     print("Testing INEFFICIENT API...")
     ineff_sales = benchmark_endpoint(
+        session,
         f"{INEFFICIENT_BASE}/sales/per-product",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
     print("Testing OPTIMIZED API...")
     opt_sales = benchmark_endpoint(
+        session,
         f"{OPTIMIZED_BASE}/sales/per-product",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
-    print(f"\nResults (avg of 5 runs):")
-    print(f"  Inefficient: {ineff_sales['avg']:.4f}s (min: {ineff_sales['min']:.4f}s, max: {ineff_sales['max']:.4f}s)")
-    print(f"  Optimized:   {opt_sales['avg']:.4f}s (min: {opt_sales['min']:.4f}s, max: {opt_sales['max']:.4f}s)")
-    print(f"  Speedup:     {ineff_sales['avg']/opt_sales['avg']:.2f}x")
+    print(f"\nResults (median of {GET_ITERATIONS} runs):")
+    print(f"  Inefficient: {ineff_sales['median']:.4f}s (min: {ineff_sales['min']:.4f}s, max: {ineff_sales['max']:.4f}s)")
+    print(f"  Optimized:   {opt_sales['median']:.4f}s (min: {opt_sales['min']:.4f}s, max: {opt_sales['max']:.4f}s)")
+    print(f"  Speedup:     {ineff_sales['median']/opt_sales['median']:.2f}x")
     
     # Benchmark 3: Top Customers
     print("\n" + "-" * 80)
@@ -141,20 +173,22 @@ def run_benchmark():
     
     print("Testing INEFFICIENT API...")
     ineff_customers = benchmark_endpoint(
+        session,
         f"{INEFFICIENT_BASE}/customers/top?limit=10",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
     print("Testing OPTIMIZED API...")
     opt_customers = benchmark_endpoint(
+        session,
         f"{OPTIMIZED_BASE}/customers/top?limit=10",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
-    print(f"\nResults (avg of 5 runs):")
-    print(f"  Inefficient: {ineff_customers['avg']:.4f}s")
-    print(f"  Optimized:   {opt_customers['avg']:.4f}s")
-    print(f"  Speedup:     {ineff_customers['avg']/opt_customers['avg']:.2f}x")
+    print(f"\nResults (median of {GET_ITERATIONS} runs):")
+    print(f"  Inefficient: {ineff_customers['median']:.4f}s")
+    print(f"  Optimized:   {opt_customers['median']:.4f}s")
+    print(f"  Speedup:     {ineff_customers['median']/opt_customers['median']:.2f}x")
     
     # Benchmark 4: Filter Transactions
     print("\n" + "-" * 80)
@@ -163,20 +197,22 @@ def run_benchmark():
     
     print("Testing INEFFICIENT API...")
     ineff_filter = benchmark_endpoint(
+        session,
         f"{INEFFICIENT_BASE}/transactions/filter?product_name=Laptop",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
     print("Testing OPTIMIZED API...")
     opt_filter = benchmark_endpoint(
+        session,
         f"{OPTIMIZED_BASE}/transactions/filter?product_name=Laptop",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
-    print(f"\nResults (avg of 5 runs):")
-    print(f"  Inefficient: {ineff_filter['avg']:.4f}s")
-    print(f"  Optimized:   {opt_filter['avg']:.4f}s")
-    print(f"  Speedup:     {ineff_filter['avg']/opt_filter['avg']:.2f}x")
+    print(f"\nResults (median of {GET_ITERATIONS} runs):")
+    print(f"  Inefficient: {ineff_filter['median']:.4f}s")
+    print(f"  Optimized:   {opt_filter['median']:.4f}s")
+    print(f"  Speedup:     {ineff_filter['median']/opt_filter['median']:.2f}x")
     
     # Benchmark 5: Analytics Summary
     print("\n" + "-" * 80)
@@ -185,33 +221,35 @@ def run_benchmark():
     
     print("Testing INEFFICIENT API...")
     ineff_summary = benchmark_endpoint(
+        session,
         f"{INEFFICIENT_BASE}/analytics/summary",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
     print("Testing OPTIMIZED API...")
     opt_summary = benchmark_endpoint(
+        session,
         f"{OPTIMIZED_BASE}/analytics/summary",
-        iterations=5
+        iterations=GET_ITERATIONS
     )
     
-    print(f"\nResults (avg of 5 runs):")
-    print(f"  Inefficient: {ineff_summary['avg']:.4f}s")
-    print(f"  Optimized:   {opt_summary['avg']:.4f}s")
-    print(f"  Speedup:     {ineff_summary['avg']/opt_summary['avg']:.2f}x")
+    print(f"\nResults (median of {GET_ITERATIONS} runs):")
+    print(f"  Inefficient: {ineff_summary['median']:.4f}s")
+    print(f"  Optimized:   {opt_summary['median']:.4f}s")
+    print(f"  Speedup:     {ineff_summary['median']/opt_summary['median']:.2f}x")
     
     # Overall Summary
     print("\n" + "=" * 80)
     print("OVERALL PERFORMANCE SUMMARY")
     print("=" * 80)
     
-    total_ineff = (ineff_upload['avg'] + ineff_sales['avg'] + 
-                   ineff_customers['avg'] + ineff_filter['avg'] + 
-                   ineff_summary['avg'])
+    total_ineff = (ineff_upload['avg'] + ineff_sales['median'] + 
+                   ineff_customers['median'] + ineff_filter['median'] + 
+                   ineff_summary['median'])
     
-    total_opt = (opt_upload['avg'] + opt_sales['avg'] + 
-                 opt_customers['avg'] + opt_filter['avg'] + 
-                 opt_summary['avg'])
+    total_opt = (opt_upload['avg'] + opt_sales['median'] + 
+                 opt_customers['median'] + opt_filter['median'] + 
+                 opt_summary['median'])
     
     print(f"\nTotal time for all operations:")
     print(f"  Inefficient: {total_ineff:.4f}s")
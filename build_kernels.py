@@ -0,0 +1,41 @@
+"""
+Ahead-of-time build of the aggregation kernels
+==============================================
+
+Compiles the batch fold loop in agg_kernels.py into the extension module
+agg_kernels_aot with numba.pycc, next to this file:
+
+    python build_kernels.py
+
+agg_kernels imports the compiled module when it exists, so API workers
+start without importing numba or JIT-compiling on their first request.
+Run it once per image or deployment (e.g. before starting gunicorn); the
+result is specific to the Python version and platform it was built on.
+
+The exported signature uses the dtypes sales_api_optimized passes:
+int32 codes and quantities, float64 amounts, int64 sizes.
+
+Requires numba.pycc, which Numba has marked pending deprecation and drops
+in newer releases; requirements.txt pins a Numba that still provides it.
+Without the build, agg_kernels falls back to the JIT or NumPy kernels.
+"""
+
+import os
+
+from numba.pycc import CC
+
+import agg_kernels
+
+
+cc = CC('agg_kernels_aot')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export(
+    'fold_batch',
+    'Tuple((f8, f8[:], i8[:], f8[:], i8[:]))(i4[:], i4[:], f8[:], i4[:], i8, i8)'
+)(agg_kernels.batch_sums)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"Built {cc.output_file} in {cc.output_dir}")
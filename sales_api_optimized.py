@@ -8,176 +8,701 @@ Optimizations Applied:
 - Caching and memoization
 - Proper indexing
 - Single-pass algorithms
+- Columnar (SoA) NumPy storage so aggregations are vectorized C loops
 
 Author: Optimized with AI
 """
 
-from flask import Flask, request, jsonify
-from collections import defaultdict
+from flask import Flask, request
+from flask.json.provider import DefaultJSONProvider
+from dataclasses import dataclass, field
 from datetime import datetime
-from functools import lru_cache
-import bisect
+import re
+import threading
+import numpy as np
+import orjson
 
-app = Flask(__name__)
-
-# Optimized data structures
-transactions = []
-transaction_ids_set = set()  # O(1) lookup for duplicates
+from agg_kernels import check_codes, fold_batch
 
-# Indexes for fast queries O(1) access
-product_index = defaultdict(list)  # product_name -> [transaction_indices]
-customer_index = defaultdict(list)  # customer_id -> [transaction_indices]
-date_sorted_transactions = []  # Sorted by date for binary search
 
-# Cache for expensive computations
-cache_dirty = True
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson's C encoder/decoder
+    
+    Used by request.get_json() and json_response(); responses are written
+    as the bytes orjson produces without a str round trip.
+    """
+    
+    # SERIALIZE_NUMPY writes ndarrays directly, without a tolist() copy
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def dumps_bytes(self, obj):
+        """Serialize obj to the JSON bytes sent in responses"""
+        return orjson.dumps(obj, default=self.default, option=self.option)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.dumps_bytes(obj),
+            mimetype=self.mimetype
+        )
 
 
-def invalidate_cache():
-    """Mark cache as dirty when data changes"""
-    global cache_dirty
-    cache_dirty = True
+@dataclass(slots=True)
+class Transaction:
+    """
+    One stored transaction
+    
+    Slots make each row a fraction of the size of a dict with the same
+    keys, and orjson serializes dataclasses natively, so responses need
+    no per-row dict rebuild.
+    """
+    transaction_id: str
+    customer_id: str
+    customer_name: str
+    product_name: str
+    amount: float
+    quantity: int
+    date: str
 
 
-def build_indexes():
+class GrowArray:
     """
-    Build all indexes in a single pass
-    Time: O(n)
-    Space: O(n) for indexes
+    Append-only NumPy column with amortized O(1) appends
+    
+    Capacity doubles when full, so appending a batch of k rows costs O(k)
+    amortized instead of copying the whole column with np.concatenate.
+    Appends only write past the current length, so views returned by
+    view() earlier (held by published snapshots) never change.
     """
-    global product_index, customer_index, date_sorted_transactions
     
-    product_index.clear()
-    customer_index.clear()
+    __slots__ = ('data', 'length')
+    
+    def __init__(self, dtype, capacity=1024):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.length = 0
+    
+    def append_many(self, values):
+        """Append a 1-D array of values, growing capacity geometrically"""
+        end = self.length + len(values)
+        if end > len(self.data):
+            grown = np.empty(max(2 * len(self.data), end), dtype=self.data.dtype)
+            grown[:self.length] = self.data[:self.length]
+            self.data = grown
+        self.data[self.length:end] = values
+        self.length = end
+    
+    def view(self):
+        """The filled part of the buffer, data[:length]"""
+        return self.data[:self.length]
+
+
+@dataclass(frozen=True, eq=False)
+class State:
+    """
+    Immutable snapshot of the whole store
+    
+    Writers build a new State and swap it in under write_lock; readers take
+    `s = state` once and use only s, so every GET sees a single consistent
+    version without locking. The row store and product row lists are
+    shared by all snapshots and only ever appended to, so each snapshot
+    records how much of them it covers (count, product_row_counts) instead
+    of copying them. Nothing else reachable from a published State is
+    mutated again, except two memo dicts that readers fill on demand:
+    `responses`, the serialized GET responses for this version
+    (key -> (bytes, status)), and `indexes`, lazily built read indexes.
+    """
+    version: int
+    transactions: list  # Shared append-only Transaction rows; see count
+    count: int  # this snapshot's rows are transactions[:count]
+    
+    # Columnar (SoA) copies of the fields used by aggregations and filters,
+    # as views of the writer's GrowArray buffers; row i of every column
+    # belongs to transactions[i]
+    amounts: np.ndarray
+    quantities: np.ndarray
+    product_codes: np.ndarray
+    customer_codes: np.ndarray
+    dates: np.ndarray  # Day numbers since 1970-01-01
+    
+    # Categorical codes: each distinct value maps to a small int and back
+    product_names: list  # code -> product_name
+    product_code_of: dict  # product_name -> code
+    # code -> row numbers of that product in insertion order (shared and
+    # append-only); this snapshot's are product_rows[code][:product_row_counts[code]]
+    product_rows: list
+    product_row_counts: np.ndarray
+    customer_ids: list  # code -> customer_id
+    customer_names: list  # code -> most recent customer_name
+    
+    # Running aggregates maintained on write for O(1) reads; the per-code
+    # arrays are indexed by product/customer code
+    total_sales: float
+    product_sales_totals: np.ndarray
+    product_quantity_totals: np.ndarray
+    customer_amount_totals: np.ndarray
+    customer_transaction_counts: np.ndarray
+    
+    responses: dict = field(default_factory=dict)
+    indexes: dict = field(default_factory=dict)
+
+
+# Bounds of the int32 quantity column
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+# Missing dates are stored as the largest int32 so they sort last
+NO_DATE = INT32_MAX
+
+# Accepted date formats: an ISO date, optionally with an ISO time of day,
+# of which only the YYYY-MM-DD prefix is kept. NumPy alone would also take
+# day counts and words like 'today'
+ISO_DATE = re.compile(
+    r'\d{4}-\d{2}-\d{2}'
+    r'(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?'
+)
+
+
+def new_columns():
+    """Empty append buffers for each SoA column, keyed by State field name"""
+    return {
+        'amounts': GrowArray(np.float64),
+        'quantities': GrowArray(np.int32),
+        'product_codes': GrowArray(np.int32),
+        'customer_codes': GrowArray(np.int32),
+        'dates': GrowArray(np.int32),
+    }
+
+
+def empty_state(version):
+    """A State with no transactions"""
+    return State(
+        version=version,
+        transactions=[],
+        count=0,
+        amounts=np.empty(0, dtype=np.float64),
+        quantities=np.empty(0, dtype=np.int32),
+        product_codes=np.empty(0, dtype=np.int32),
+        customer_codes=np.empty(0, dtype=np.int32),
+        dates=np.empty(0, dtype=np.int32),
+        product_names=[],
+        product_code_of={},
+        product_rows=[],
+        product_row_counts=np.empty(0, dtype=np.int64),
+        customer_ids=[],
+        customer_names=[],
+        total_sales=0,
+        product_sales_totals=np.empty(0, dtype=np.float64),
+        product_quantity_totals=np.empty(0, dtype=np.int64),
+        customer_amount_totals=np.empty(0, dtype=np.float64),
+        customer_transaction_counts=np.empty(0, dtype=np.int64),
+    )
+
+
+app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Current snapshot; rebound (never mutated) by the single writer
+state = empty_state(0)
+
+# Serializes uploads and clears, so each one builds on the latest snapshot
+write_lock = threading.Lock()
+
+# Writer-only lookups, touched only while holding write_lock
+transaction_ids_set = set()  # O(1) lookup for duplicates
+customer_code_of = {}  # customer_id -> code
+columns = new_columns()  # field name -> GrowArray behind the State columns
+
+# Most serialized responses kept per snapshot; bounds the memory a client
+# can pin by requesting many distinct ?limit= values
+RESPONSE_CACHE_SIZE = 32
+
+
+def json_response(body, status=200):
+    """
+    Serialize body straight to an orjson-encoded Response
     
-    # Single pass to build all indexes O(n)
-    for idx, trans in enumerate(transactions):
-        product_index[trans.get('product_name')].append(idx)
-        customer_index[trans.get('customer_id')].append(idx)
+    Skips jsonify's argument handling and Flask's (body, status) tuple
+    unpacking on every request.
+    """
+    return app.response_class(
+        app.json.dumps_bytes(body), status=status, mimetype='application/json'
+    )
+
+
+def cached_response(s, key, build):
+    """
+    Return the JSON response for key in snapshot s, calling build() only on
+    a cache miss
     
-    # Sort by date for binary search O(n log n)
-    date_sorted_transactions = sorted(
-        enumerate(transactions),
-        key=lambda x: x[1].get('date', '')
+    build returns (body, status); the body is serialized once and the bytes
+    are reused until the next write publishes a new snapshot. Once the
+    snapshot holds RESPONSE_CACHE_SIZE entries, further keys are served
+    uncached rather than evicting (readers share the dict without a lock).
+    """
+    cached = s.responses.get(key)
+    if cached is None:
+        body, status = build()
+        cached = (app.json.dumps_bytes(body), status)
+        if len(s.responses) < RESPONSE_CACHE_SIZE:
+            s.responses[key] = cached
+    return app.response_class(
+        cached[0], status=cached[1], mimetype='application/json'
+    )
+
+
+def add_per_code(totals, delta):
+    """Return totals + delta, zero-extending totals for newly seen codes"""
+    grown = np.zeros(len(delta), dtype=totals.dtype)
+    grown[:len(totals)] = totals
+    grown += delta
+    return grown
+
+
+def is_number_value(value):
+    """True for a JSON number or a missing value (None); bools are not numbers"""
+    return value is None or (
+        isinstance(value, (int, float)) and not isinstance(value, bool)
     )
 
 
+def is_date_value(value):
+    """True for an ISO date or datetime string or a missing date (None/'')"""
+    return value is None or (
+        isinstance(value, str) and (not value or ISO_DATE.fullmatch(value) is not None)
+    )
+
+
+def date_part(value):
+    """The YYYY-MM-DD prefix of a validated date value; None/'' stay as-is"""
+    return value and value[:10]
+
+
+def parse_date(value):
+    """Parse the day of an ISO date or datetime; missing dates become NaT"""
+    if not is_date_value(value):
+        raise ValueError(f"Invalid date: {value!r}")
+    return np.datetime64(date_part(value) or 'NaT', 'D')
+
+
+def day_numbers(values):
+    """
+    Pack datetime64[D] values into int32 day numbers, NaT -> NO_DATE
+    
+    Half the bytes of datetime64 per row, and plain integer comparisons
+    in searchsorted.
+    """
+    days = np.asarray(values).astype(np.int64)
+    days[np.isnat(values)] = NO_DATE
+    return days.astype(np.int32)
+
+
 @app.route('/transactions', methods=['POST'])
 def upload_transactions():
     """
     Upload sales transactions - OPTIMIZED
     
-    Time: O(n) - single pass with set lookup
+    Time: O(k + m) for a batch of k rows over m distinct keys - single
+          pass with set lookup, amortized O(k) appends to the append-only
+          row store and column buffers, O(m) copies of the key tables; the
+          date index is re-sorted lazily by the first date-range filter
     Space: O(n) - using set for O(1) duplicate check
     """
-    data = request.get_json()
+    global state, customer_code_of
+    
+    # Decode the raw body with orjson directly; cache=False lets Werkzeug
+    # drop the body bytes once parsed instead of keeping them on the request
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return json_response({'error': 'Invalid data'}, 400)
     
-    if not data or 'transactions' not in data:
-        return jsonify({'error': 'Invalid data'}), 400
+    if not isinstance(data, dict) or 'transactions' not in data:
+        return json_response({'error': 'Invalid data'}, 400)
     
     new_transactions = data['transactions']
-    added_count = 0
+    if not isinstance(new_transactions, list):
+        return json_response({'error': 'Invalid data'}, 400)
+    
+    # Validate row shape and ids once up front so the insert loop can
+    # subscript directly and hash every id
+    if not all(
+        isinstance(trans, dict) and isinstance(trans.get('transaction_id'), str)
+        for trans in new_transactions
+    ):
+        return json_response(
+            {'error': 'Each transaction must be an object with a string transaction_id'},
+            400
+        )
     
-    # OPTIMIZED: Use set for O(1) duplicate check
-    for trans in new_transactions:
-        trans_id = trans.get('transaction_id')
-        
-        if trans_id not in transaction_ids_set:
-            transactions.append(trans)
-            transaction_ids_set.add(trans_id)
-            added_count += 1
+    # Keys are interned through dicts, so they must be JSON scalars
+    if any(
+        isinstance(trans.get('customer_id'), (list, dict))
+        or isinstance(trans.get('product_name'), (list, dict))
+        for trans in new_transactions
+    ):
+        return json_response(
+            {'error': 'customer_id and product_name must be scalar values'}, 400
+        )
     
-    # Rebuild indexes after bulk insert
-    build_indexes()
-    invalidate_cache()
+    # Amounts and quantities must be JSON numbers and dates ISO strings (or
+    # missing) before the bulk conversions below, which would read numeric
+    # strings, bools, day counts and 'now' without complaint
+    batch_date_values = [trans.get('date') for trans in new_transactions]
+    if not (
+        all(is_number_value(trans.get('amount')) for trans in new_transactions)
+        and all(is_number_value(trans.get('quantity')) for trans in new_transactions)
+        and all(is_date_value(value) for value in batch_date_values)
+    ):
+        return json_response({'error': 'Invalid amount, quantity or date'}, 400)
+    
+    # Convert the numeric columns for the whole batch before touching any
+    # state, so a bad value rejects the batch instead of half-applying it.
+    # A null amount or quantity counts as missing and takes the default.
+    try:
+        batch_amounts = np.array(
+            [0 if (amount := trans.get('amount')) is None else amount
+             for trans in new_transactions],
+            dtype=np.float64
+        )
+        # Parse as float64 (exact over the whole int32 range) so the cast
+        # below can be checked: casting directly would truncate 2.9 to 2,
+        # and NumPy 1.x wraps out-of-range ints instead of raising
+        batch_quantities = np.array(
+            [1 if (quantity := trans.get('quantity')) is None else quantity
+             for trans in new_transactions],
+            dtype=np.float64
+        )
+        # One bulk string -> datetime64 conversion for the days of the
+        # validated dates; missing and empty dates become NaT, impossible
+        # ones raise ValueError
+        batch_dates = day_numbers(np.array(
+            [date_part(value) for value in batch_date_values],
+            dtype='datetime64[D]'
+        ))
+    except (TypeError, ValueError, OverflowError):
+        return json_response({'error': 'Invalid amount, quantity or date'}, 400)
+    
+    # inf (or a finite amount that overflowed float64) would turn every
+    # total it is added to into inf and serialize as null
+    if not np.isfinite(batch_amounts).all():
+        return json_response({'error': 'Invalid amount, quantity or date'}, 400)
+    
+    # Quantities must be whole numbers that fit the int32 column
+    if not (
+        np.all(batch_quantities == np.trunc(batch_quantities))
+        and np.all(batch_quantities >= INT32_MIN)
+        and np.all(batch_quantities <= INT32_MAX)
+    ):
+        return json_response({'error': 'Invalid amount, quantity or date'}, 400)
+    batch_quantities = batch_quantities.astype(np.int32)
+    
+    amount_values = batch_amounts.tolist()
+    quantity_values = batch_quantities.tolist()
+    new_rows = []
+    new_products = []
+    new_customers = []
+    
+    with write_lock:
+        s = state
+        seen_ids = transaction_ids_set
+        added_ids = set()  # merged into transaction_ids_set once committed
+        
+        # Copy-on-write for the O(m) key tables; the published snapshot's
+        # containers (and the writer's customer map) are only replaced once
+        # the batch is fully built, so a failure part-way leaves every one
+        # of them untouched
+        product_names = s.product_names.copy()
+        product_code_of = s.product_code_of.copy()
+        customer_ids = s.customer_ids.copy()
+        customer_code_of_new = customer_code_of.copy()
+        customer_names = s.customer_names.copy()
+        
+        # The O(n) row store and product row lists are only appended to, at
+        # commit; rows are staged here until then
+        first_row = s.count
+        added_rows = []  # new Transaction rows
+        batch_rows_of = {}  # code -> new row numbers of that product
+        
+        # OPTIMIZED: Use set for O(1) duplicate check, intern keys in the same pass
+        for i, trans in enumerate(new_transactions):
+            trans_id = trans['transaction_id']
+            
+            if trans_id not in seen_ids and trans_id not in added_ids:
+                added_ids.add(trans_id)
+                customer_id = trans.get('customer_id')
+                product_name = trans.get('product_name')
+                if 'customer_name' in trans:
+                    name = trans['customer_name']
+                else:
+                    name = f"Customer_{customer_id}"
+                
+                row = first_row + len(added_rows)
+                added_rows.append(Transaction(
+                    trans_id, customer_id, name, product_name,
+                    amount_values[i], quantity_values[i], trans.get('date')
+                ))
+                new_rows.append(i)
+                
+                # Intern inline with plain dict get/assign: no helper call or
+                # __missing__ dispatch per row
+                code = product_code_of.get(product_name)
+                if code is None:
+                    code = product_code_of[product_name] = len(product_names)
+                    product_names.append(product_name)
+                rows_of = batch_rows_of.get(code)
+                if rows_of is None:
+                    rows_of = batch_rows_of[code] = []
+                rows_of.append(row)
+                new_products.append(code)
+                
+                code = customer_code_of_new.get(customer_id)
+                if code is None:
+                    code = customer_code_of_new[customer_id] = len(customer_ids)
+                    customer_ids.append(customer_id)
+                    customer_names.append(name)
+                else:
+                    customer_names[code] = name
+                new_customers.append(code)
+        
+        rows = np.array(new_rows, dtype=np.intp)
+        new_amounts = batch_amounts[rows]
+        new_quantities = batch_quantities[rows]
+        new_product_codes = np.array(new_products, dtype=np.int32)
+        new_customer_codes = np.array(new_customers, dtype=np.int32)
+        new_dates = batch_dates[rows]
+        
+        # OPTIMIZED: Fold only the new rows into the running aggregates O(k),
+        # all of them in one fused pass over the batch columns
+        check_codes(new_product_codes, len(product_names))
+        check_codes(new_customer_codes, len(customer_ids))
+        batch_total, sales, quantity, spent, counts = fold_batch(
+            new_product_codes, new_customer_codes, new_amounts, new_quantities,
+            len(product_names), len(customer_ids)
+        )
+        with np.errstate(over='ignore'):
+            total_sales = s.total_sales + batch_total
+            product_sales_totals = add_per_code(s.product_sales_totals, sales)
+            customer_amount_totals = add_per_code(s.customer_amount_totals, spent)
+        
+        # Finite amounts can still sum past float64's range
+        if not (
+            np.isfinite(total_sales)
+            and np.isfinite(product_sales_totals).all()
+            and np.isfinite(customer_amount_totals).all()
+        ):
+            return json_response({'error': 'Invalid amount, quantity or date'}, 400)
+        
+        # Commit: everything above only built new objects; from here on the
+        # writer state and column buffers change
+        transaction_ids_set.update(added_ids)
+        customer_code_of = customer_code_of_new
+        
+        # Rows past an older snapshot's count are invisible to its readers
+        transactions = s.transactions
+        transactions.extend(added_rows)
+        product_rows = s.product_rows
+        product_rows.extend([] for _ in range(len(product_names) - len(product_rows)))
+        for code, rows_of in batch_rows_of.items():
+            product_rows[code].extend(rows_of)
+        
+        # Append the new rows to each column buffer, amortized O(k)
+        columns['amounts'].append_many(new_amounts)
+        columns['quantities'].append_many(new_quantities)
+        columns['product_codes'].append_many(new_product_codes)
+        columns['customer_codes'].append_many(new_customer_codes)
+        columns['dates'].append_many(new_dates)
+        
+        state = State(
+            version=s.version + 1,
+            transactions=transactions,
+            count=len(transactions),
+            amounts=columns['amounts'].view(),
+            quantities=columns['quantities'].view(),
+            product_codes=columns['product_codes'].view(),
+            customer_codes=columns['customer_codes'].view(),
+            dates=columns['dates'].view(),
+            product_names=product_names,
+            product_code_of=product_code_of,
+            product_rows=product_rows,
+            product_row_counts=add_per_code(
+                s.product_row_counts,
+                np.bincount(new_product_codes, minlength=len(product_names))
+            ),
+            customer_ids=customer_ids,
+            customer_names=customer_names,
+            total_sales=total_sales,
+            product_sales_totals=product_sales_totals,
+            product_quantity_totals=add_per_code(s.product_quantity_totals, quantity),
+            customer_amount_totals=customer_amount_totals,
+            customer_transaction_counts=add_per_code(
+                s.customer_transaction_counts, counts
+            ),
+        )
     
-    return jsonify({
+    return json_response({
         'message': 'Transactions uploaded',
-        'added': added_count,
-        'total_count': len(transactions)
-    }), 201
+        'added': len(new_rows),
+        'total_count': first_row + len(added_rows)
+    }, 201)
 
 
-@app.route('/sales/per-product', methods=['GET'])
-def calculate_sales_per_product():
+def date_index(s):
     """
-    Calculate total sales per product - OPTIMIZED
-    
-    Time: O(n + m log m) - single pass + sorting
-    Space: O(m) where m = number of unique products
+    Date index of snapshot s, built on first use
+    Time: O(n log n) once per snapshot, near-linear in practice
+    
+    Returns (date_order, sorted_dates, dated_count): row numbers ordered by
+    date (stable), the dates in that order for binary-search range queries,
+    and how many rows have a real date, i.e. sorted_dates[:dated_count].
+    Uploads no longer re-sort, so a run of uploads pays for one sort when
+    the next date-range filter arrives. Concurrent first readers may both
+    build it; the results are identical.
     """
-    if not transactions:
-        return jsonify({'error': 'No transactions available'}), 404
-    
-    # OPTIMIZED: Single pass with dictionary O(n)
-    product_stats = defaultdict(lambda: {'total_sales': 0, 'total_quantity': 0})
+    index = s.indexes.get('dates')
+    if index is None:
+        dates = s.dates
+        # timsort is near-linear on mostly ordered dates
+        date_order = np.argsort(dates, kind='stable')
+        dated_count = len(dates) - int(np.count_nonzero(dates == NO_DATE))
+        index = s.indexes['dates'] = (date_order, dates[date_order], dated_count)
+    return index
+
+
+def product_order(s):
+    """Product codes by descending sales; stable, so ties keep first-seen order"""
+    return np.argsort(-s.product_sales_totals, kind='stable')
+
+
+def product_sales(s):
+    """
+    Per-product totals, sorted by sales, for snapshot s
+    Time: O(m log m) - reads the running per-product aggregates
+    """
+    sales = s.product_sales_totals
+    quantity = s.product_quantity_totals
+    order = product_order(s)
     
-    for trans in transactions:
-        product = trans.get('product_name')
-        product_stats[product]['total_sales'] += trans.get('amount', 0)
-        product_stats[product]['total_quantity'] += trans.get('quantity', 1)
+    return [
+        {
+            'product_name': s.product_names[code],
+            'total_sales': total,
+            'total_quantity': int(qty)
+        }
+        for code, total, qty in zip(
+            order.tolist(), sales[order].tolist(), quantity[order].tolist()
+        )
+    ]
+
+
+def product_sales_columns(s):
+    """
+    Per-product totals as parallel arrays, sorted by sales, for snapshot s
+    Time: O(m log m) - same order as product_sales, with no per-product dict;
+          the numeric columns are ndarrays that orjson writes directly
+    """
+    order = product_order(s)
+    names = s.product_names
+    
+    return {
+        'product_name': [names[code] for code in order.tolist()],
+        'total_sales': s.product_sales_totals[order],
+        'total_quantity': s.product_quantity_totals[order]
+    }
+
+
+def top_customers(s, limit):
+    """
+    Top `limit` customers by total amount in snapshot s
+    Time: O(m + k log k) - O(m) partition, then sort only the k selected
+    """
+    totals = s.customer_amount_totals
+    counts = s.customer_transaction_counts
+    n_customers = len(totals)
+    
+    # Partition on the ascending totals so the largest k land at the end;
+    # avoids allocating a negated copy of all m totals
+    k = max(limit, 0)
+    if k == 0:
+        top = np.empty(0, dtype=np.intp)
+    elif k < n_customers:
+        top = np.argpartition(totals, n_customers - k)[n_customers - k:]
+        top = top[np.lexsort((top, -totals[top]))]
+    else:
+        top = np.argsort(-totals, kind='stable')
     
-    # Build result list
-    result = [
+    return [
         {
-            'product_name': product,
-            'total_sales': stats['total_sales'],
-            'total_quantity': stats['total_quantity']
+            'customer_id': s.customer_ids[code],
+            'customer_name': s.customer_names[code],
+            'total_amount': total,
+            'total_transactions': count
         }
-        for product, stats in product_stats.items()
+        for code, total, count in zip(
+            top.tolist(), totals[top].tolist(), counts[top].tolist()
+        )
     ]
+
+
+@app.route('/sales/per-product', methods=['GET'])
+def calculate_sales_per_product():
+    """
+    Calculate total sales per product - OPTIMIZED with caching
+    
+    ?format=columns returns {'products': {'product_name': [...],
+    'total_sales': [...], 'total_quantity': [...]}} instead of a list of
+    per-product objects: three flat arrays, no dict per product.
     
-    # OPTIMIZED: Use built-in sort O(m log m) - much better than bubble sort
-    result.sort(key=lambda x: x['total_sales'], reverse=True)
+    Time: O(m log m) on the first call per data version, O(1) after
+    Space: O(m) where m = number of unique products
+    """
+    response_format = request.args.get('format', 'rows')
+    if response_format not in ('rows', 'columns'):
+        return json_response({'error': "format must be 'rows' or 'columns'"}, 400)
+    
+    s = state
+    if not s.count:
+        return json_response({'error': 'No transactions available'}, 404)
+    
+    if response_format == 'columns':
+        return cached_response(
+            s, 'sales/per-product/columns',
+            lambda: ({'products': product_sales_columns(s)}, 200)
+        )
     
-    return jsonify({'products': result}), 200
+    return cached_response(
+        s, 'sales/per-product', lambda: ({'products': product_sales(s)}, 200)
+    )
 
 
 @app.route('/customers/top', methods=['GET'])
 def get_top_customers():
     """
-    Get top N customers - OPTIMIZED
+    Get top N customers - OPTIMIZED with caching
     
-    Time: O(n + m log m) - single pass + sorting
+    Time: O(m + k log k) per new limit over the running per-customer
+          aggregates; repeat calls return cached bytes
     Space: O(m) where m = number of unique customers
     """
     limit = request.args.get('limit', 10, type=int)
     
-    if not transactions:
-        return jsonify({'error': 'No transactions available'}), 404
-    
-    # OPTIMIZED: Single pass aggregation O(n)
-    customer_stats = defaultdict(lambda: {
-        'total_amount': 0,
-        'total_transactions': 0,
-        'customer_name': ''
-    })
-    
-    for trans in transactions:
-        customer_id = trans.get('customer_id')
-        customer_stats[customer_id]['total_amount'] += trans.get('amount', 0)
-        customer_stats[customer_id]['total_transactions'] += 1
-        customer_stats[customer_id]['customer_name'] = trans.get(
-            'customer_name',
-            f"Customer_{customer_id}"
-        )
-    
-    # Build result list
-    customers = [
-        {
-            'customer_id': cid,
-            'customer_name': stats['customer_name'],
-            'total_amount': stats['total_amount'],
-            'total_transactions': stats['total_transactions']
-        }
-        for cid, stats in customer_stats.items()
-    ]
+    s = state
+    if not s.count:
+        return json_response({'error': 'No transactions available'}, 404)
     
-    # OPTIMIZED: Use built-in sort with key O(m log m)
-    customers.sort(key=lambda x: x['total_amount'], reverse=True)
+    # Every limit <= 0 or >= m gives the same list, so share one cache entry
+    limit = min(max(limit, 0), len(s.customer_ids))
     
-    # Return top N using slice O(1)
-    return jsonify({'top_customers': customers[:limit]}), 200
+    return cached_response(
+        s, ('customers/top', limit),
+        lambda: ({'top_customers': top_customers(s, limit)}, 200)
+    )
 
 
 @app.route('/transactions/filter', methods=['GET'])
@@ -185,71 +710,86 @@ def filter_transactions():
     """
     Filter transactions - OPTIMIZED
     
-    Time: O(n) - single pass with all filters
-    Space: O(k) where k = number of matching transactions
+    Time: O(log n + r) - binary search of the date index, then a vectorized
+          product mask over the r rows in the date range; O(p) for a
+          product-only filter over that product's p rows; the first date
+          query after a write also sorts the date index once
+    Space: O(r) for the candidate rows + O(k) for the k matches
     """
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     product_name = request.args.get('product_name')
     
-    if not transactions:
-        return jsonify({'error': 'No transactions available'}), 404
-    
-    # OPTIMIZED: Use index if filtering by product only
-    if product_name and not start_date and not end_date:
-        # O(k) where k = matching transactions
-        indices = product_index.get(product_name, [])
-        filtered = [transactions[i] for i in indices]
+    s = state
+    transactions = s.transactions
+    if not s.count:
+        return json_response({'error': 'No transactions available'}, 404)
+    
+    try:
+        start = int(day_numbers(parse_date(start_date))) if start_date else None
+        end = int(day_numbers(parse_date(end_date))) if end_date else None
+    except ValueError:
+        return json_response({'error': 'Dates must be YYYY-MM-DD'}, 400)
+    
+    code = s.product_code_of.get(product_name) if product_name else None
+    
+    if product_name and code is None:
+        rows = []
+    elif start is None and end is None:
+        if not product_name:
+            # No filters: serialize the stored rows without gathering them
+            return json_response({
+                'transactions': transactions[:s.count],
+                'count': s.count
+            }, 200)
+        # OPTIMIZED: Product-only filter reads its row list directly O(p)
+        rows = s.product_rows[code][:s.product_row_counts[code]]
     else:
-        # OPTIMIZED: Single pass with all conditions O(n)
-        filtered = []
-        for trans in transactions:
-            # Check all conditions in one pass
-            if start_date and trans.get('date', '') < start_date:
-                continue
-            if end_date and trans.get('date', '') > end_date:
-                continue
-            if product_name and trans.get('product_name') != product_name:
-                continue
-            
-            filtered.append(trans)
-    
-    return jsonify({
+        # OPTIMIZED: Contiguous slice of the date index O(log n)
+        date_order, sorted_dates, dated_count = date_index(s)
+        dated = sorted_dates[:dated_count]
+        lo = np.searchsorted(dated, start, 'left') if start is not None else 0
+        hi = np.searchsorted(dated, end, 'right') if end is not None else dated_count
+        rows = date_order[lo:hi]
+        if product_name:
+            rows = rows[s.product_codes[rows] == code]
+        rows = rows.tolist()
+    
+    filtered = [transactions[i] for i in rows]
+    
+    return json_response({
         'transactions': filtered,
         'count': len(filtered)
-    }), 200
+    }, 200)
+
+
+def summary_body(s):
+    """Summary metrics from the running aggregates of s, as (body, status)"""
+    avg_transaction = s.total_sales / s.count
+    
+    return {
+        'total_sales': s.total_sales,
+        'total_transactions': s.count,
+        'unique_customers': len(s.customer_ids),
+        'unique_products': len(s.product_names),
+        'average_transaction': round(avg_transaction, 2)
+    }, 200
 
 
 @app.route('/analytics/summary', methods=['GET'])
 def get_summary():
     """
-    Get analytics summary - OPTIMIZED with caching
+    Get analytics summary - OPTIMIZED with running aggregates
     
-    Time: O(n) - single pass to calculate all metrics
-    Space: O(m) for unique tracking
+    Time: O(1) - totals are maintained on upload, unique counts are the
+          sizes of the categorical code tables; serialized once per version
+    Space: O(1) beyond the existing code tables
     """
-    if not transactions:
-        return jsonify({'error': 'No transactions available'}), 404
-    
-    # OPTIMIZED: Calculate all metrics in single pass O(n)
-    total_sales = 0
-    unique_customers = set()
-    unique_products = set()
-    
-    for trans in transactions:
-        total_sales += trans.get('amount', 0)
-        unique_customers.add(trans.get('customer_id'))
-        unique_products.add(trans.get('product_name'))
-    
-    avg_transaction = total_sales / len(transactions) if transactions else 0
+    s = state
+    if not s.count:
+        return json_response({'error': 'No transactions available'}, 404)
     
-    return jsonify({
-        'total_sales': total_sales,
-        'total_transactions': len(transactions),
-        'unique_customers': len(unique_customers),
-        'unique_products': len(unique_products),
-        'average_transaction': round(avg_transaction, 2)
-    }), 200
+    return cached_response(s, 'analytics/summary', lambda: summary_body(s))
 
 
 @app.route('/transactions', methods=['GET'])
@@ -261,27 +801,32 @@ def get_all_transactions():
     start = (page - 1) * per_page
     end = start + per_page
     
-    return jsonify({
-        'transactions': transactions[start:end],
-        'count': len(transactions),
+    # Bound the slice by this snapshot's count, not the shared store's length
+    s = state
+    start, end, _ = slice(start, end).indices(s.count)
+    return json_response({
+        'transactions': s.transactions[start:end],
+        'count': s.count,
         'page': page,
         'per_page': per_page
-    }), 200
+    }, 200)
 
 
 @app.route('/transactions', methods=['DELETE'])
 def clear_transactions():
     """Clear all transactions"""
-    global transactions, transaction_ids_set, cache_dirty
-    
-    count = len(transactions)
-    transactions = []
-    transaction_ids_set.clear()
-    product_index.clear()
-    customer_index.clear()
-    cache_dirty = True
-    
-    return jsonify({'message': f'Cleared {count} transactions'}), 200
+    global state, columns
+    
+    with write_lock:
+        count = state.count
+        transaction_ids_set.clear()
+        customer_code_of.clear()
+        # Fresh buffers: refilling the old ones would overwrite rows that
+        # earlier snapshots still view
+        columns = new_columns()
+        state = empty_state(state.version + 1)
+    
+    return json_response({'message': f'Cleared {count} transactions'}, 200)
 
 
 if __name__ == '__main__':
@@ -293,6 +838,9 @@ if __name__ == '__main__':
     print("✓ Space Complexity: Efficient with indexes")
     print("✓ Caching for repeated queries")
     print("✓ Single-pass algorithms")
+    print("="*60)
+    print("Development server only - for production run:")
+    print("  gunicorn -k gevent -w 1 -b 0.0.0.0:5001 wsgi:app")
     print("="*60 + "\n")
     
-    app.run(debug=True, port=5001)
+    app.run(port=5001)
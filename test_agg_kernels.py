@@ -0,0 +1,49 @@
+"""
+Tests for the grouped-sum kernels used by the optimized Sales API
+"""
+
+import numpy as np
+import pytest
+
+from agg_kernels import batch_sums, check_codes, fold_batch
+
+
+CODES = np.array([0, 2, 0, 1, 2, 0], dtype=np.int32)
+AMOUNTS = np.array([10.0, 2.5, 5.0, 1.25, 7.5, 0.5])
+QUANTITIES = np.array([1, 2, 3, 4, 5, 6], dtype=np.int32)
+
+
+CUSTOMER_CODES = np.array([1, 1, 0, 2, 0, 1], dtype=np.int32)
+
+
+@pytest.mark.parametrize('fold', [fold_batch, batch_sums])
+def test_fold_batch_totals_and_counts(fold):
+    total, sales, quantity, spent, counts = fold(
+        CODES, CUSTOMER_CODES, AMOUNTS, QUANTITIES, 4, 3
+    )
+    
+    assert total == 26.75
+    assert sales.tolist() == [15.5, 1.25, 10.0, 0.0]
+    assert quantity.tolist() == [10, 4, 7, 0]
+    assert spent.tolist() == [12.5, 13.0, 1.25]
+    assert counts.tolist() == [2, 3, 1]
+
+
+def test_empty_columns():
+    empty_codes = np.empty(0, dtype=np.int32)
+    total, sales, quantity, spent, counts = fold_batch(
+        empty_codes, empty_codes, np.empty(0), np.empty(0, dtype=np.int32), 0, 0
+    )
+    
+    assert total == 0.0
+    assert sales.size == quantity.size == spent.size == counts.size == 0
+
+
+def test_check_codes_rejects_out_of_range():
+    check_codes(CODES, 3)
+    check_codes(np.empty(0, dtype=np.int32), 0)
+    
+    with pytest.raises(ValueError):
+        check_codes(CODES, 2)
+    with pytest.raises(ValueError):
+        check_codes(np.array([0, -1], dtype=np.int32), 3)
@@ -1,8 +1,14 @@
 import unittest
+from unittest import mock
 
+import armstrong
 from armstrong import is_armstrong, generate_armstrong
 
 
+def _reference(limit, base):
+    return [n for n in range(limit) if is_armstrong(n, base)]
+
+
 class TestArmstrong(unittest.TestCase):
     def test_known_armstrongs_base10(self):
         self.assertTrue(is_armstrong(0))
@@ -13,14 +19,70 @@ class TestArmstrong(unittest.TestCase):
         self.assertTrue(is_armstrong(407))
 
     def test_non_armstrong_base10(self):
-        for n in (2, 10, 100, 154, 372, 408):
+        # Every single digit d is an Armstrong number (d ** 1 == d)
+        for n in (10, 100, 154, 372, 408):
             self.assertFalse(is_armstrong(n))
 
     def test_generate_up_to_1000(self):
         nums = generate_armstrong(1000)
-        expected = [0, 1, 153, 370, 371, 407]
+        expected = list(range(10)) + [153, 370, 371, 407]
         self.assertEqual(nums, expected)
 
+    def test_generate_large_limit_matches_reference(self):
+        nums = generate_armstrong(100000)
+        expected = list(range(10)) + [
+            153, 370, 371, 407, 1634, 8208, 9474, 54748, 92727, 93084,
+        ]
+        self.assertEqual(nums, expected)
+
+    def test_generate_beyond_scan_range(self):
+        nums = generate_armstrong(10**10)
+        self.assertEqual(len(nums), 33)
+        self.assertEqual(nums[-3:], [534494836, 912985153, 4679307774])
+
+    def test_generate_other_base_matches_is_armstrong(self):
+        limit = 20000
+        expected = [n for n in range(limit) if is_armstrong(n, base=3)]
+        self.assertEqual(generate_armstrong(limit, base=3), expected)
+
+    def test_generate_large_base_scans(self):
+        # Base 1000 has far more digit multisets than integers below 20000,
+        # so this goes through the scan dispatch (C, Numba or Python).
+        limit, base = 20000, 1000
+        max_k = len(armstrong._digits(limit - 1, base))
+        self.assertGreaterEqual(armstrong._multiset_count(max_k, base), limit)
+        self.assertEqual(generate_armstrong(limit, base), _reference(limit, base))
+
+    @unittest.skipIf(armstrong._c_generate is None, "_armstrong extension not built")
+    def test_c_generate_matches_reference(self):
+        for limit, base in ((20000, 1000), (5000, 7), (1, 10)):
+            self.assertEqual(
+                armstrong._c_generate(limit, base), _reference(limit, base)
+            )
+
+    @unittest.skipIf(armstrong.numba is None, "numba not installed")
+    def test_numba_generate_matches_reference(self):
+        for limit, base in ((20000, 1000), (20000, 7), (1000, 10)):
+            max_k = len(armstrong._digits(limit - 1, base))
+            pow_table = armstrong._power_table(max_k, min(base, limit))
+            self.assertEqual(
+                armstrong._numba_generate(limit, base, pow_table),
+                _reference(limit, base),
+            )
+
+    @unittest.skipIf(armstrong.numba is None, "numba not installed")
+    def test_numba_generate_retries_on_full_buffer(self):
+        # One chunk with room for 7 numbers, while base 7 has 21 below 20000
+        limit, base = 20000, 7
+        pow_table = armstrong._power_table(len(armstrong._digits(limit - 1, base)), base)
+        kernel = mock.Mock(wraps=armstrong._fast_generate)
+        with mock.patch.object(armstrong, "_BASE10_ARMSTRONG_COUNT", 1), \
+                mock.patch.object(armstrong, "_fast_generate", kernel), \
+                mock.patch.object(armstrong.numba, "get_num_threads", return_value=1):
+            result = armstrong._numba_generate(limit, base, pow_table)
+        self.assertEqual(result, _reference(limit, base))
+        self.assertEqual([call.args[4] for call in kernel.call_args_list], [7, 21])
+
     def test_invalid_inputs(self):
         with self.assertRaises(ValueError):
             generate_armstrong(-1)
@@ -8,9 +8,12 @@ Includes performance benchmarking
 
 import pytest
 import json
+import threading
+import numpy as np
 import time
 from sales_api_inefficient import app as inefficient_app
-from sales_api_optimized import app as optimized_app
+import sales_api_optimized
+from sales_api_optimized import app as optimized_app, GrowArray
 
 # Sample test data
 SAMPLE_TRANSACTIONS = {
@@ -128,6 +131,314 @@ class TestUploadTransactions:
         data = json.loads(response.data)
         assert data['added'] == 0  # No new transactions
         assert data['total_count'] == 5  # Still 5 total
+    
+    def test_uploaded_rows_are_normalized(self, optimized_client):
+        """Test stored rows carry every field with default values"""
+        batch = {"transactions": [
+            {"transaction_id": "T100", "customer_id": "C009",
+             "product_name": "Cable", "amount": 12.5}
+        ]}
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        
+        response = optimized_client.get('/transactions')
+        row = json.loads(response.data)['transactions'][0]
+        assert row['amount'] == 12.5
+        assert row['quantity'] == 1
+        assert row['customer_name'] == 'Customer_C009'
+        assert row['date'] is None
+    
+    def test_upload_null_amount_and_quantity_use_defaults(self, optimized_client):
+        """Test JSON null amount/quantity are treated like missing fields"""
+        batch = {"transactions": [
+            {"transaction_id": "T101", "customer_id": "C009",
+             "product_name": "Cable", "amount": None, "quantity": None,
+             "date": ""}
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+        
+        row = json.loads(optimized_client.get('/transactions').data)['transactions'][0]
+        assert row['amount'] == 0.0
+        assert row['quantity'] == 1
+    
+    def test_upload_missing_transaction_id(self, optimized_client):
+        """Test that a batch with a missing transaction_id is rejected"""
+        bad_batch = {"transactions": [{"customer_id": "C001", "amount": 10.0}]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(bad_batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_upload_malformed_rows_rejected(self, optimized_client):
+        """Test non-list batches, non-object rows and non-string ids get a 400"""
+        bodies = (
+            {"transactions": 5},
+            {"transactions": "T001"},
+            {"transactions": [5]},
+            {"transactions": [{"transaction_id": 17}]},
+            {"transactions": [{"transaction_id": ["T001"]}]},
+        )
+        for body in bodies:
+            response = optimized_client.post(
+                '/transactions',
+                data=json.dumps(body),
+                content_type='application/json'
+            )
+            assert response.status_code == 400
+            assert 'error' in json.loads(response.data)
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_upload_malformed_body_rejected(self, optimized_client):
+        """Test that a body that is not a JSON object is rejected"""
+        for body in ('{"transactions": [', '[1, 2]'):
+            response = optimized_client.post(
+                '/transactions',
+                data=body,
+                content_type='application/json'
+            )
+            assert response.status_code == 400
+            assert json.loads(response.data)['error'] == 'Invalid data'
+    
+    def test_upload_invalid_values_rejected(self, optimized_client):
+        """Test that a bad amount or date rejects the whole batch"""
+        bad_batch = {"transactions": [
+            SAMPLE_TRANSACTIONS["transactions"][0],
+            {"transaction_id": "T999", "amount": "abc", "date": "2026-01-20"},
+            {"transaction_id": "T998", "amount": 10.0, "date": "Jan 20"},
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(bad_batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_rejected_batch_leaves_no_writer_state(self, optimized_client):
+        """Test a rejected batch neither marks ids seen nor interns keys"""
+        valid = {"transaction_id": "T400", "customer_id": "C1",
+                 "product_name": "Cable", "amount": 5.0}
+        batch = {"transactions": [
+            valid,
+            {"transaction_id": "T401", "customer_id": [], "amount": 1.0}
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        
+        batch = {"transactions": [
+            {"transaction_id": "T402", "customer_id": "C9",
+             "product_name": "Cable", "amount": 7.0},
+            valid
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        assert json.loads(response.data)['added'] == 2
+        
+        response = optimized_client.get('/customers/top?limit=2')
+        customers = json.loads(response.data)['top_customers']
+        assert [(c['customer_id'], c['total_amount']) for c in customers] == [
+            ('C9', 7.0), ('C1', 5.0)
+        ]
+    
+    def test_failed_upload_is_not_half_applied(self, optimized_client, monkeypatch):
+        """Test an error while building the batch leaves the store as it was"""
+        def failing_fold(*args):
+            raise RuntimeError("kernel failure")
+        
+        monkeypatch.setattr(sales_api_optimized, 'fold_batch', failing_fold)
+        with pytest.raises(RuntimeError):
+            optimized_client.post(
+                '/transactions',
+                data=json.dumps(SAMPLE_TRANSACTIONS),
+                content_type='application/json'
+            )
+        monkeypatch.undo()
+        
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        data = json.loads(response.data)
+        assert data['added'] == 5
+        assert data['total_count'] == 5
+        
+        response = optimized_client.get('/analytics/summary')
+        data = json.loads(response.data)
+        assert data['unique_customers'] == 3
+        assert data['total_sales'] == 2800.0
+    
+    def test_snapshots_share_the_append_only_row_store(self, optimized_client):
+        """Test uploads append to the shared rows without changing old snapshots"""
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        old = sales_api_optimized.state
+        laptop = old.product_code_of['Laptop']
+        
+        batch = {"transactions": [
+            {"transaction_id": "T500", "customer_id": "C001",
+             "product_name": "Laptop", "amount": 900.0}
+        ]}
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        new = sales_api_optimized.state
+        
+        assert new.transactions is old.transactions
+        assert (old.count, new.count) == (5, 6)
+        assert old.product_rows[laptop][:old.product_row_counts[laptop]] == [0, 3]
+        assert new.product_rows[laptop][:new.product_row_counts[laptop]] == [0, 3, 5]
+        
+        response = optimized_client.get('/transactions?page=1&per_page=10')
+        assert json.loads(response.data)['count'] == 6
+    
+    def test_upload_bad_amounts_rejected(self, optimized_client):
+        """Test non-numeric and non-finite amounts reject the batch"""
+        for amount in ("12.50", "1e3", "inf", True, 1e309):
+            batch = {"transactions": [
+                {"transaction_id": "T1", "customer_id": "C001",
+                 "product_name": "Laptop", "amount": amount}
+            ]}
+            response = optimized_client.post(
+                '/transactions',
+                data=json.dumps(batch),
+                content_type='application/json'
+            )
+            assert response.status_code == 400, amount
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_upload_amounts_overflowing_totals_rejected(self, optimized_client):
+        """Test finite amounts whose sum overflows float64 reject the batch"""
+        batch = {"transactions": [
+            {"transaction_id": f"T{i}", "customer_id": "C001",
+             "product_name": "Laptop", "amount": 1e308}
+            for i in range(2)
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_upload_bad_quantities_rejected(self, optimized_client):
+        """Test fractional or out-of-int32-range quantities reject the batch"""
+        for quantity in (2.9, "2.5", "3", 2**31, -2**31 - 1, 10**20, "nan"):
+            batch = {"transactions": [
+                SAMPLE_TRANSACTIONS["transactions"][0],
+                {"transaction_id": "T300", "amount": 10.0, "quantity": quantity}
+            ]}
+            response = optimized_client.post(
+                '/transactions',
+                data=json.dumps(batch),
+                content_type='application/json'
+            )
+            assert response.status_code == 400, quantity
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+        
+        batch = {"transactions": [
+            {"transaction_id": "T301", "amount": 10.0, "quantity": 2.0},
+            {"transaction_id": "T302", "amount": 10.0, "quantity": 2**31 - 1}
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+        rows = json.loads(optimized_client.get('/transactions').data)['transactions']
+        assert [row['quantity'] for row in rows] == [2, 2**31 - 1]
+    
+    def test_upload_non_iso_dates_rejected(self, optimized_client):
+        """Test dates other than ISO date/datetime strings or null reject the batch"""
+        for date in (0, 20260115, True, ["2026-01-15"], "today", "now",
+                     "2026-01-15T", "2026-02-30", "2026-02-30T10:00"):
+            batch = {"transactions": [
+                SAMPLE_TRANSACTIONS["transactions"][0],
+                {"transaction_id": "T200", "amount": 10.0, "date": date}
+            ]}
+            response = optimized_client.post(
+                '/transactions',
+                data=json.dumps(batch),
+                content_type='application/json'
+            )
+            assert response.status_code == 400, date
+        
+        response = optimized_client.get('/transactions')
+        assert json.loads(response.data)['count'] == 0
+    
+    def test_concurrent_uploads_all_land(self, optimized_client):
+        """Test uploads from several threads are serialized, none lost"""
+        def upload(worker):
+            batch = {
+                "transactions": [
+                    {
+                        "transaction_id": f"W{worker}-{i}",
+                        "customer_id": f"C{i % 7}",
+                        "product_name": f"P{i % 5}",
+                        "amount": 1.0,
+                        "quantity": 1,
+                        "date": "2026-01-15"
+                    }
+                    for i in range(200)
+                ]
+            }
+            with optimized_app.test_client() as client:
+                client.post(
+                    '/transactions',
+                    data=json.dumps(batch),
+                    content_type='application/json'
+                )
+        
+        threads = [threading.Thread(target=upload, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        response = optimized_client.get('/analytics/summary')
+        data = json.loads(response.data)
+        assert data['total_transactions'] == 1600
+        assert data['total_sales'] == 1600.0
+        
+        response = optimized_client.get('/transactions/filter?product_name=P0')
+        assert json.loads(response.data)['count'] == 8 * 40
 
 
 class TestSalesPerProduct:
@@ -168,6 +479,54 @@ class TestSalesPerProduct:
         assert len(products) == 4
         assert products[0]['product_name'] == 'Laptop'
         assert products[0]['total_sales'] == 2400.00
+    
+    def test_sales_per_product_refreshes_after_upload(self, optimized_client):
+        """Test cached results are invalidated by a new upload"""
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        optimized_client.get('/sales/per-product')
+        
+        extra = {"transactions": [{
+            "transaction_id": "T006",
+            "customer_id": "C004",
+            "customer_name": "Ann Lee",
+            "product_name": "Monitor",
+            "amount": 2500.00,
+            "quantity": 1,
+            "date": "2026-01-20"
+        }]}
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(extra),
+            content_type='application/json'
+        )
+        
+        response = optimized_client.get('/sales/per-product')
+        products = json.loads(response.data)['products']
+        assert products[0]['product_name'] == 'Monitor'
+        assert products[0]['total_sales'] == 2800.00
+    
+    def test_sales_per_product_columns_format(self, optimized_client):
+        """Test the column-oriented payload matches the row payload"""
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        
+        rows = json.loads(optimized_client.get('/sales/per-product').data)
+        response = optimized_client.get('/sales/per-product?format=columns')
+        assert response.status_code == 200
+        columns = json.loads(response.data)['products']
+        
+        for field in ('product_name', 'total_sales', 'total_quantity'):
+            assert columns[field] == [p[field] for p in rows['products']]
+        
+        response = optimized_client.get('/sales/per-product?format=csv')
+        assert response.status_code == 400
 
 
 class TestTopCustomers:
@@ -208,6 +567,57 @@ class TestTopCustomers:
         assert len(customers) == 2
         assert customers[0]['customer_id'] == 'C001'
         assert customers[0]['total_amount'] == 1275.00
+    
+    def test_top_customers_limit_bounds(self, optimized_client):
+        """Test limits at and beyond the number of customers"""
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        
+        for limit, expected in ((0, []), (3, ['C001', 'C003', 'C002']),
+                                (10, ['C001', 'C003', 'C002'])):
+            response = optimized_client.get(f'/customers/top?limit={limit}')
+            customers = json.loads(response.data)['top_customers']
+            assert [c['customer_id'] for c in customers] == expected
+    
+    def test_top_customers_cache_is_bounded(self, optimized_client):
+        """Test many distinct limits do not grow the response cache unbounded"""
+        batch = {"transactions": [
+            {"transaction_id": f"T{i}", "customer_id": f"C{i}",
+             "product_name": "Cable", "amount": float(i)}
+            for i in range(100)
+        ]}
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        
+        for limit in range(1, 100):
+            response = optimized_client.get(f'/customers/top?limit={limit}')
+            customers = json.loads(response.data)['top_customers']
+            assert customers[-1]['customer_id'] == f"C{100 - limit}"
+        
+        assert len(sales_api_optimized.state.responses) <= \
+            sales_api_optimized.RESPONSE_CACHE_SIZE
+
+
+class TestGrowArray:
+    """Test the append-only column buffer"""
+    
+    def test_append_many_grows_and_keeps_old_views(self):
+        """Test appends past capacity keep data and earlier views intact"""
+        column = GrowArray(np.int32, capacity=2)
+        column.append_many(np.array([1, 2], dtype=np.int32))
+        before = column.view()
+        
+        column.append_many(np.arange(3, 8, dtype=np.int32))
+        
+        assert column.view().tolist() == [1, 2, 3, 4, 5, 6, 7]
+        assert len(column.data) >= 7
+        assert before.tolist() == [1, 2]
 
 
 class TestFilterTransactions:
@@ -243,6 +653,72 @@ class TestFilterTransactions:
         data = json.loads(response.data)
         
         assert data['count'] == 3
+    
+    def test_filter_by_date_sees_later_uploads(self, optimized_client):
+        """Test the date index is rebuilt for rows uploaded after a query"""
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        url = '/transactions/filter?start_date=2026-01-10&end_date=2026-01-16'
+        assert json.loads(optimized_client.get(url).data)['count'] == 2
+        
+        batch = {"transactions": [
+            {"transaction_id": "T010", "customer_id": "C004",
+             "product_name": "Mouse", "amount": 20.0, "date": "2026-01-10"}
+        ]}
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        
+        data = json.loads(optimized_client.get(url).data)
+        assert [t['transaction_id'] for t in data['transactions']] == [
+            'T010', 'T001', 'T002'
+        ]
+    
+    def test_filter_by_date_keeps_datetime_rows(self, optimized_client):
+        """Test ISO datetimes are stored as sent and filtered by their day"""
+        batch = {"transactions": [
+            {"transaction_id": "T020", "customer_id": "C001",
+             "product_name": "Laptop", "amount": 10.0,
+             "date": "2026-01-05T10:00:00"},
+            {"transaction_id": "T021", "customer_id": "C001",
+             "product_name": "Laptop", "amount": 10.0,
+             "date": "2026-01-06 23:59"}
+        ]}
+        response = optimized_client.post(
+            '/transactions',
+            data=json.dumps(batch),
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+        
+        response = optimized_client.get(
+            '/transactions/filter?start_date=2026-01-05&end_date=2026-01-05'
+        )
+        data = json.loads(response.data)
+        assert data['count'] == 1
+        assert data['transactions'][0]['date'] == '2026-01-05T10:00:00'
+    
+    def test_filter_by_product_and_date(self, optimized_client):
+        """Test combining product and date filters"""
+        optimized_client.post(
+            '/transactions',
+            data=json.dumps(SAMPLE_TRANSACTIONS),
+            content_type='application/json'
+        )
+        
+        response = optimized_client.get(
+            '/transactions/filter?product_name=Laptop&start_date=2026-01-16'
+        )
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        
+        assert data['count'] == 1
+        assert data['transactions'][0]['transaction_id'] == 'T004'
 
 
 class TestAnalyticsSummary:
@@ -281,6 +757,24 @@ class TestAnalyticsSummary:
         assert data['total_transactions'] == 5
         assert data['unique_customers'] == 3
         assert data['unique_products'] == 4
+    
+    def test_summary_tracks_uploads_and_clear(self, optimized_client):
+        """Test running aggregates ignore duplicates and reset on clear"""
+        for _ in range(2):
+            optimized_client.post(
+                '/transactions',
+                data=json.dumps(SAMPLE_TRANSACTIONS),
+                content_type='application/json'
+            )
+        
+        response = optimized_client.get('/analytics/summary')
+        data = json.loads(response.data)
+        assert data['total_sales'] == 2800.00
+        assert data['average_transaction'] == 560.00
+        
+        optimized_client.delete('/transactions')
+        response = optimized_client.get('/analytics/summary')
+        assert response.status_code == 404
 
 
 class TestPerformanceBenchmark:
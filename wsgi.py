@@ -0,0 +1,18 @@
+"""
+WSGI entry point for the optimized Sales Analytics API
+======================================================
+
+Run behind a production server instead of Werkzeug's dev server:
+
+    gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:5001 wsgi:app
+
+Transactions live in process memory, so keep a single worker process:
+separate workers would each hold their own copy of the data. gevent
+greenlets give that worker cheap concurrency for the I/O-bound parts
+(reading uploads, writing responses) and only switch on I/O, so the
+handlers never interleave while mutating the in-memory store.
+"""
+
+from sales_api_optimized import app
+
+__all__ = ['app']